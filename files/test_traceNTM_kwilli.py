@@ -1,4 +1,8 @@
-import subprocess
+import io
+import re
+from contextlib import redirect_stdout
+
+import traceNTM_kwilli as ntm_mod
 
 test_cases = [
     {
@@ -37,6 +41,12 @@ test_cases = [
         "max_depth": "10",
         "expected_result": "reject",
     },
+    {
+        "description": "Non-Latin-1 character leading to rejection",
+        "input_string": "a€a",
+        "max_depth": "10",
+        "expected_result": "reject",
+    },
     {
         "description": "Large valid input string within depth limit",
         "input_string": "aaaaaaa",
@@ -49,34 +59,128 @@ test_cases = [
         "max_depth": "8",
         "expected_result": "stopped",
     },
+    {
+        "description": "Acceptance with every level expanded on the thread pool",
+        "input_string": "aaaaa",
+        "max_depth": "10",
+        "expected_result": "accept",
+        "threaded": True,
+    },
+    {
+        "description": "Rejection with every level expanded on the thread pool",
+        "input_string": "ababa",
+        "max_depth": "10",
+        "expected_result": "reject",
+        "threaded": True,
+    },
+    {
+        "description": "Step limit with every level expanded on the thread pool",
+        "input_string": "aaaaaaaaaa",
+        "max_depth": "5",
+        "expected_result": "stopped",
+        "threaded": True,
+    },
+    {
+        "description": "Acceptance with iterative-deepening DFS",
+        "input_string": "aaaaa",
+        "max_depth": "10",
+        "expected_result": "accept",
+        "strategy": "dfs",
+    },
+    {
+        "description": "Rejection with iterative-deepening DFS",
+        "input_string": "ababa",
+        "max_depth": "10",
+        "expected_result": "reject",
+        "strategy": "dfs",
+    },
+    {
+        "description": "Step limit with iterative-deepening DFS",
+        "input_string": "aaaaaaaaaa",
+        "max_depth": "5",
+        "expected_result": "stopped",
+        "strategy": "dfs",
+    },
+    {
+        "description": "Step limit on a machine that keeps checkpoints",
+        "input_string": "aaaaaaaaaa",
+        "max_depth": "5",
+        "expected_result": "stopped",
+        "checkpoint": True,
+    },
+    {
+        "description": "Deeper step limit resumed from the previous checkpoint",
+        "input_string": "aaaaaaaaaa",
+        "max_depth": "8",
+        "expected_result": "stopped",
+        "checkpoint": True,
+    },
+    {
+        "description": "Step limit before a deeper rerun of the same input",
+        "input_string": "aaaaaaa",
+        "max_depth": "5",
+        "expected_result": "stopped",
+        "checkpoint": True,
+    },
+    {
+        "description": "Acceptance resumed from a checkpoint",
+        "input_string": "aaaaaaa",
+        "max_depth": "15",
+        "expected_result": "accept",
+        "checkpoint": True,
+    },
 ]
 
-traceNTM_path = "traceNTM_kwilli.py"
 machine_file_path = "machine_kwilli.csv"
 
-def run_test(case):
-    result = subprocess.run(
-        ["python3", traceNTM_path, machine_file_path, case["input_string"], case["max_depth"]],
-        capture_output=True,
-        text=True,
-    )
+# Matches every summary line the test reads, so the output is scanned in a single pass
+summary_pattern = re.compile(
+    r"^(?:String (?P<status>accepted|rejected) in"
+    r"|(?P<stopped>Execution stopped after)"
+    r"|Total Configurations Explored:\s*(?P<configurations>\d+)"
+    r"|Depth of Tree:\s*(?P<depth>\d+))",
+    re.M,
+)
+status_names = {"accepted": "accept", "rejected": "reject"}
+
+# Parse the machine once and reuse it for every case
+ntm = ntm_mod.NonDeterministicTuringMachine(machine_file_path)
 
-    output = result.stdout.strip()
+# Sends every non-empty frontier through the thread pool, which the sample machine never reaches otherwise
+threaded_ntm = ntm_mod.NonDeterministicTuringMachine(machine_file_path, workers=4, parallel_threshold=1)
 
-    if "String accepted in" in output:
-        result_status = "accept"
-    elif "String rejected in" in output:
-        result_status = "reject"
-    elif "Execution stopped after" in output:
-        result_status = "stopped"
+# Cases that rerun an input with a deeper limit resume from where the earlier run stopped
+checkpoint_ntm = ntm_mod.NonDeterministicTuringMachine(machine_file_path, keep_checkpoints=True)
+
+def run_test(case):
+    if case.get("threaded"):
+        machine = threaded_ntm
+    elif case.get("checkpoint"):
+        machine = checkpoint_ntm
     else:
-        result_status = "unknown"
+        machine = ntm
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        ntm_mod.run_machine(
+            machine, case["input_string"], int(case["max_depth"]), case.get("strategy", "bfs")
+        )
 
-    configurations_line = [line for line in output.split("\n") if "Total Configurations Explored:" in line]
-    total_configurations = int(configurations_line[0].split(":")[-1]) if configurations_line else 0
+    output = buf.getvalue().strip()
 
-    depth_line = [line for line in output.split("\n") if "Depth of Tree:" in line]
-    depth = int(depth_line[0].split(":")[-1]) if depth_line else 0
+    result_status = "unknown"
+    total_configurations = None
+    depth = None
+    for match in summary_pattern.finditer(output):
+        if match["status"] and result_status == "unknown":
+            result_status = status_names[match["status"]]
+        elif match["stopped"] and result_status == "unknown":
+            result_status = "stopped"
+        elif match["configurations"] and total_configurations is None:
+            total_configurations = int(match["configurations"])
+        elif match["depth"] and depth is None:
+            depth = int(match["depth"])
+    total_configurations = total_configurations or 0
+    depth = depth or 0
 
     return {
         "input_string": case["input_string"],
@@ -1,24 +1,38 @@
 import csv
 import sys
-from collections import defaultdict
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+# Frontiers smaller than this are expanded on the calling thread by default
+PARALLEL_THRESHOLD = 2048
 
 # Represents a single configuration (state of the machine) during the simulation
 class Configuration:
-    def __init__(self, tape, state, head, parent=None):
-        self.tape = tape # Current tape contents
-        self.state = state # Current state of the machine
+    __slots__ = ("tape", "tape_len", "state", "head", "parent") # No per-instance __dict__
+
+    def __init__(self, tape, state, head, parent=None, tape_len=None):
+        self.tape = tape # Tape buffer (blank-padded bytes or a bitmap int, shared with the parent when unchanged)
+        self.tape_len = len(tape) if tape_len is None else tape_len # Number of cells actually on the tape
+        self.state = state # Current state of the machine (integer state id)
         self.head = head # Position of the tape head
         self.parent = parent # Reference to the parent configuration (for backtracking)
 
 # Implements the Non-Deterministic Turing Machine (NTM)
 class NonDeterministicTuringMachine:
-    def __init__(self, filename):
-        self.transitions = defaultdict(list) # Stores the state transition rules
+    def __init__(self, filename, workers=1, keep_checkpoints=False, parallel_threshold=PARALLEL_THRESHOLD):
         self.parse_file(filename) # Reads machine configuration from a CSV file
+        # Threads used to expand large frontiers. Expansion is pure Python and holds the GIL,
+        # so more than one worker only helps on a free-threaded interpreter.
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold # Smallest frontier handed to the thread pool
+        # Frontier and visited set of the latest stopped BFS run, by input string, so a deeper rerun can resume
+        self.checkpoints = {} if keep_checkpoints else None
         self.max_depth = 0 # Maximum depth for the simulation
+        self.depth = 0 # Depth reached by the last simulation
         self.accept_path = None # Path to an accepting configuration, if found
         self.total_configurations = 0 # Total number of unique configurations explored
-        self.level_branching = [] # Tracks branching factor at each simulation level
+        self.sum_branching = 0 # Sum of the branching factors of all expanded levels
+        self.num_branching_levels = 0 # Number of levels that produced children
 
     # Parses the NTM configuration from a CSV file
     def parse_file(self, filename):
@@ -31,77 +45,360 @@ class NonDeterministicTuringMachine:
             self.start_state = next(reader)[0] # Starting state
             self.accept_state = next(reader)[0] # Accepting state
             self.reject_state = next(reader)[0] # Rejecting state
-            # Add transitions to the machine
+            # Map each state name to a small integer id (names may repeat, the reject state may not be listed)
+            self.state_id = {}
+            for state in self.states + [self.start_state, self.accept_state, self.reject_state]:
+                self.state_id.setdefault(state, len(self.state_id))
+            # Stream the transition rules into typed columns instead of one tuple of strings per rule
+            rules = (array("i"), array("B"), array("i"), array("B"), array("b"))
+            rule_states, rule_reads, rule_next_states, rule_writes, rule_moves = rules
             for line in reader:
                 if line:
                     current_state, read_char, next_state, write_char, move = line
-                    self.transitions[(current_state, read_char)].append(
-                        (next_state, write_char, move)
-                    )
+                    self.check_symbol(read_char, f"Transition read (line {reader.line_num})")
+                    self.check_symbol(write_char, f"Transition write (line {reader.line_num})")
+                    rule_states.append(self.state_id.setdefault(current_state, len(self.state_id)))
+                    rule_reads.append(ord(read_char))
+                    rule_next_states.append(self.state_id.setdefault(next_state, len(self.state_id)))
+                    rule_writes.append(ord(write_char))
+                    rule_moves.append(1 if move == "R" else -1) # Head movement as an integer offset
+        self.state_names = list(self.state_id) # Reverse lookup from state id to name
+        self.accept_id = self.state_id[self.accept_state]
+        self.reject_id = self.state_id[self.reject_state]
+        self.build_transition_table(rules)
+
+    # Checks that a machine symbol is one character that fits in a single tape byte
+    def check_symbol(self, symbol, field):
+        if len(symbol) != 1 or ord(symbol) > 255:
+            raise ValueError(f"{field} symbol {symbol!r} must be a single Latin-1 character")
+        return symbol
+
+    # Builds a dense transition table indexed by state_id * alphabet_size + char_id
+    # from the (state, read, next state, write, move) rule columns
+    def build_transition_table(self, rules):
+        # Alphabet rows only seed the columns, so entries that are not one tape byte are skipped
+        alphabet = [symbol.strip() for symbol in self.tape_alphabet + self.input_alphabet]
+        symbols = dict.fromkeys(symbol for symbol in alphabet if len(symbol) == 1 and ord(symbol) <= 255)
+        symbols["_"] = None
+        symbols.update(dict.fromkeys(map(chr, rules[1])))
+        symbols.update(dict.fromkeys(map(chr, rules[3])))
+        self.alphabet_size = len(symbols) + 1 # Last column is for symbols outside the alphabet
+        # Maps every byte value to its column; unknown bytes land in the empty last column
+        self.char_id = [self.alphabet_size - 1] * 256
+        for i, symbol in enumerate(symbols):
+            self.char_id[ord(symbol)] = i
+        # Tape byte for input characters with no byte of their own; it has no column, so it is never read
+        self.spare_byte = next((byte for byte in range(255, -1, -1) if chr(byte) not in symbols), None)
+
+        table = [[] for _ in range(len(self.state_id) * self.alphabet_size)]
+        for current_state, read_byte, next_state, write_byte, move_delta in zip(*rules):
+            table[current_state * self.alphabet_size + self.char_id[read_byte]].append(
+                (next_state, write_byte, move_delta)
+            )
+        # Each cell holds a tuple of (next_state_id, write_byte, move_delta)
+        self.trans_table = [tuple(cell) for cell in table]
+
+        # Two-symbol machines can store tapes as bitmaps: bit i is set iff cell i is not blank
+        self.bitmap_symbols = None
+        if len(symbols) == 2:
+            self.bitmap_symbols = ["_"] + [symbol for symbol in symbols if symbol != "_"]
+            self.bit_bytes = [ord(symbol) for symbol in self.bitmap_symbols] # Tape byte for each bit value
+            self.bit_char_id = [self.char_id[byte] for byte in self.bit_bytes] # Table column for each bit value
+
+    # Builds the starting configuration and picks the tape representation for this run
+    def initial_configuration(self, input_string):
+        # Latin-1 maps each character to exactly one tape byte, so cells and characters line up.
+        # Characters outside Latin-1 are stored as the spare byte, which the machine cannot read,
+        # and their original text is kept by position for printing.
+        self.unreadable = {i: char for i, char in enumerate(input_string) if ord(char) > 255}
+        if not self.unreadable:
+            tape = input_string.encode("latin-1")
+        elif self.spare_byte is not None:
+            tape = bytes(self.spare_byte if ord(char) > 255 else ord(char) for char in input_string)
+        else:
+            raise ValueError("Every tape byte is a machine symbol, so non-Latin-1 input has no cell value")
+        start_id = self.state_id[self.start_state]
+        if self.bitmap_symbols and set(input_string) <= set(self.bitmap_symbols):
+            self.expand = self.expand_bitmap_configs
+            bits = "".join("0" if char == "_" else "1" for char in reversed(input_string))
+            return Configuration(int(bits or "0", 2), start_id, 0, None, len(tape))
+        self.expand = self.expand_configs
+        return Configuration(tape, start_id, 0, None, len(tape))
 
     # Simulates the NTM for a given input string and maximum depth
     def simulate(self, input_string, max_depth):
+        if self.workers <= 1:
+            return self.run_bfs(input_string, max_depth, None)
+        # One pool serves every level of the run; its threads start on first use
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return self.run_bfs(input_string, max_depth, executor)
+
+    # Breadth-first search over configurations, expanding large levels on executor when given
+    def run_bfs(self, input_string, max_depth, executor):
         self.max_depth = max_depth
-        initial_config = Configuration(input_string, self.start_state, 0) # Initialize with starting configuration
-        self.tree = [[initial_config]] # Tracks configurations at each depth level
-        visited = set() # Tracks visited configurations to avoid duplication
-        level = 0 # Tracks the current depth of the simulation
+        self.accept_path = None # Reset statistics so the machine can be reused across inputs
+        self.total_configurations = 0
+        self.sum_branching = 0
+        self.num_branching_levels = 0
+        initial_config = self.initial_configuration(input_string) # Initialize with starting configuration
+        current_level, rejected, accepted = self.classify_initial(initial_config) # The BFS frontier
+        # Visited (tape, tape_len, state, head) keys. A buffer's capacity only depends on tape_len,
+        # so equal tapes of the same length always have equal (blank-padded) buffers.
+        visited = set()
+        self.depth = 0 # Tracks the current depth of the simulation
+
+        # Resume a run on the same input that stopped at a depth limit no deeper than this one
+        checkpoint = self.checkpoints.get(input_string) if self.checkpoints is not None else None
+        if checkpoint and checkpoint[0] <= max_depth + 1:
+            del self.checkpoints[input_string] # The resumed run mutates the saved state
+            (self.depth, current_level, rejected, accepted, visited,
+             self.total_configurations, self.sum_branching, self.num_branching_levels) = checkpoint
 
-        while level <= max_depth:
-            current_level = self.tree[level] # Configurations at the current depth
-            next_level = [] # Configurations to explore at the next depth
-            branching_factor = 0 # Tracks the number of new branches at this level
+        visited_add = visited.add # Bound once; the loop below runs for every configuration
+
+        while self.depth <= max_depth:
+            # Accepting children are spotted while the level is built, so it is never scanned
+            if accepted is not None:
+                self.total_configurations += accepted[0] # Configurations up to the accepting one
+                self.accept_path = accepted[1]
+                self.print_accept_path() # Print the accepting path
+                return "accept"
+
+            # Rejecting children are only counted, never built
+            level_size = len(current_level) + rejected
+            self.total_configurations += level_size # Count this level's configurations
+            expandable = [] # Configurations whose transitions still need to be applied
+            expandable_append = expandable.append
 
             for current_config in current_level:
-                self.total_configurations += 1 # Increment unique configurations explored
-                tape = current_config.tape
                 state = current_config.state
                 head = current_config.head
 
                 # Skip already-visited configurations
-                if (tape, state, head) in visited:
+                key = (current_config.tape, current_config.tape_len, state, head)
+                if key in visited:
+                    continue
+                visited_add(key)
+
+                # Handle out-of-bounds tape head
+                if head < 0:
+                    continue
+                expandable_append(current_config)
+
+            # Configurations to explore at the next depth, expanded in parallel for large frontiers
+            if executor is not None and len(expandable) >= self.parallel_threshold:
+                size = -(-len(expandable) // self.workers)
+                chunks = [expandable[i:i + size] for i in range(0, len(expandable), size)]
+                results = list(executor.map(self.expand, chunks))
+            else:
+                results = [self.expand(expandable)]
+
+            # Merge the chunks in order, offsetting each chunk's accept position by the ones before it
+            next_level = []
+            rejected = 0
+            accepted = None
+            for children, chunk_rejected, chunk_accepted in results:
+                if accepted is None and chunk_accepted is not None:
+                    accepted = (len(next_level) + rejected + chunk_accepted[0], chunk_accepted[1])
+                next_level += children
+                rejected += chunk_rejected
+            branching_factor = len(next_level) + rejected # Number of new branches at this level
+
+            # If no further configurations can be explored
+            if not branching_factor:
+                print("String rejected in", self.depth, "steps.")
+                return "reject"
+
+            # Update branching factor and prepare for the next level
+            self.sum_branching += branching_factor / level_size
+            self.num_branching_levels += 1
+
+            # Only parent pointers keep earlier levels alive: dropping the old frontier frees
+            # every configuration (and its tape) that has no descendant on the new one
+            current_level = next_level
+            self.depth += 1
+
+        # If the depth limit is reached without a result
+        if self.checkpoints is not None:
+            self.checkpoints.clear() # Only the latest input is kept, so stopped runs do not pile up
+            self.checkpoints[input_string] = (
+                self.depth, current_level, rejected, accepted, visited,
+                self.total_configurations, self.sum_branching, self.num_branching_levels,
+            )
+        print("Execution stopped after", max_depth, "steps.")
+        return "stopped"
+
+    # Drops any saved checkpoint so its frontier and visited set can be freed
+    def clear_checkpoints(self):
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
+
+    # Sorts the starting configuration the way expand_configs sorts children:
+    # returns (frontier, rejected count, (position, config) if accepting else None)
+    def classify_initial(self, config):
+        if config.state == self.accept_id:
+            return [], 0, (1, config)
+        if config.state == self.reject_id:
+            return [], 1, None
+        return [config], 0, None
+
+    # Applies every matching transition to each configuration, keeping input order.
+    # Returns (children, number of rejecting children skipped, first accepting child or None);
+    # the accepting child comes as (1-based position among all children, configuration)
+    def expand_configs(self, configs):
+        accept_id = self.accept_id
+        reject_id = self.reject_id
+        rejected = 0
+        accepted = None
+        trans_table = self.trans_table
+        char_id = self.char_id
+        alphabet_size = self.alphabet_size
+        children = []
+        append = children.append
+        for config in configs:
+            tape = config.tape
+            tape_len = config.tape_len
+            head = config.head
+            if head >= tape_len:
+                tape_len = head + 1
+                # Cells past tape_len are already blank, so only grow (by doubling) when out of capacity
+                if tape_len > len(tape):
+                    tape += b"_" * max(tape_len - len(tape), len(tape))
+
+            # Apply transitions for the current state and tape character
+            char_at_head = tape[head]
+            # Sibling transitions writing the same symbol in a row share one written tape
+            last_write = char_at_head
+            written_tape = tape
+            for next_state, write_byte, move_delta in trans_table[
+                config.state * alphabet_size + char_id[char_at_head]
+            ]:
+                if next_state == reject_id:
+                    rejected += 1
+                    continue
+                # Only copy the tape when the transition changes it
+                if write_byte == char_at_head:
+                    new_tape = tape
+                elif write_byte == last_write:
+                    new_tape = written_tape
+                else:
+                    new_tape = bytearray(tape)
+                    new_tape[head] = write_byte
+                    written_tape = new_tape = bytes(new_tape)
+                    last_write = write_byte
+                append(Configuration(new_tape, next_state, head + move_delta, config, tape_len))
+                if next_state == accept_id and accepted is None:
+                    accepted = (len(children) + rejected, children[-1])
+        return children, rejected, accepted
+
+    # Bitmap variant of expand_configs for two-symbol tapes held as Python ints
+    def expand_bitmap_configs(self, configs):
+        accept_id = self.accept_id
+        reject_id = self.reject_id
+        rejected = 0
+        accepted = None
+        trans_table = self.trans_table
+        alphabet_size = self.alphabet_size
+        bit_bytes = self.bit_bytes
+        bit_char_id = self.bit_char_id
+        children = []
+        append = children.append
+        for config in configs:
+            tape = config.tape
+            tape_len = config.tape_len
+            head = config.head
+            if head >= tape_len:
+                # Bits past tape_len are zero, so the new cells are already blank
+                tape_len = head + 1
+
+            # Apply transitions for the current state and the bit under the head
+            bit = (tape >> head) & 1
+            char_at_head = bit_bytes[bit]
+            for next_state, write_byte, move_delta in trans_table[
+                config.state * alphabet_size + bit_char_id[bit]
+            ]:
+                if next_state == reject_id:
+                    rejected += 1
+                    continue
+                if write_byte == char_at_head:
+                    new_tape = tape
+                else:
+                    new_tape = tape ^ (1 << head) # Writing the other symbol flips the bit
+                append(Configuration(new_tape, next_state, head + move_delta, config, tape_len))
+                if next_state == accept_id and accepted is None:
+                    accepted = (len(children) + rejected, children[-1])
+        return children, rejected, accepted
+
+    # Simulates the NTM with iterative-deepening DFS. The explicit stack replaces the BFS frontier,
+    # but the per-pass visited map still grows with every distinct configuration reached.
+    def simulate_dfs(self, input_string, max_depth):
+        self.max_depth = max_depth
+        self.accept_path = None # Reset statistics so the machine can be reused across inputs
+        self.total_configurations = 0
+        self.sum_branching = 0
+        self.num_branching_levels = 0
+        accept_id = self.accept_id
+        reject_id = self.reject_id
+        initial_config = self.initial_configuration(input_string)
+
+        # Deepen the limit one step at a time so the first accept found is the shallowest one
+        for limit in range(max_depth + 1):
+            visited = {} # Shallowest depth at which each configuration was reached in this pass
+            level_configs = [0] * (limit + 1) # Configurations popped at each depth
+            level_children = [0] * (limit + 1) # Children produced at each depth
+            truncated = False # Whether the depth limit cut off any branch in this pass
+            self.depth = 0
+            stack = [(initial_config, 0)]
+
+            while stack:
+                current_config, depth = stack.pop()
+                self.total_configurations += 1
+                self.depth = max(self.depth, depth)
+                level_configs[depth] += 1
+                state = current_config.state
+                key = (current_config.tape, current_config.tape_len, state, current_config.head)
+
+                # Skip configurations already reached at the same or a shallower depth
+                if visited.get(key, limit + 1) <= depth:
                     continue
-                visited.add((tape, state, head))
+                visited[key] = depth
 
                 # Check for accepting or rejecting states
-                if state == self.accept_state:
+                if state == accept_id:
                     self.accept_path = current_config
                     self.print_accept_path() # Print the accepting path
                     return "accept"
-                elif state == self.reject_state:
+                elif state == reject_id or current_config.head < 0:
                     continue
 
-                # Handle out-of-bounds tape head
-                if head < 0:
+                # Rejecting children come back as a count; tally them as if they had been popped
+                children, rejected, _ = self.expand([current_config])
+                if depth == limit:
+                    truncated = truncated or bool(children) or bool(rejected)
                     continue
-                if head >= len(tape):
-                    tape += "_" * (head - len(tape) + 1)
-
-                # Apply transitions for the current state and tape character
-                char_at_head = tape[head]
-                for next_state, write_char, move in self.transitions.get(
-                    (state, char_at_head), []
-                ):
-                    branching_factor += 1
-                    new_tape = list(tape)
-                    new_tape[head] = write_char
-                    new_head = head + (1 if move == "R" else -1)
-                    next_config = Configuration("".join(new_tape), next_state, new_head, parent=current_config)
-                    next_level.append(next_config)
+                level_children[depth] += len(children) + rejected
+                if rejected:
+                    self.total_configurations += rejected
+                    self.depth = max(self.depth, depth + 1)
+                    level_configs[depth + 1] += rejected
+                # Push in reverse so children are explored in transition order
+                for child in reversed(children):
+                    stack.append((child, depth + 1))
 
-            # Update branching factor and prepare for the next level
-            if next_level:
-                self.level_branching.append(branching_factor / len(current_level))
-
-            # If no further configurations can be explored
-            if not next_level:
-                print("String rejected in", level, "steps.")
+            # Branching statistics describe the last (deepest) pass only
+            self.sum_branching = 0
+            self.num_branching_levels = 0
+            for configs, children in zip(level_configs, level_children):
+                if children:
+                    self.sum_branching += children / configs
+                    self.num_branching_levels += 1
+            # Nothing was cut off, so the whole computation tree has been explored
+            if not truncated:
+                print("String rejected in", self.depth, "steps.")
                 return "reject"
 
-            self.tree.append(next_level)
-            level += 1
-
         # If the depth limit is reached without a result
+        self.depth = max_depth + 1
         print("Execution stopped after", max_depth, "steps.")
         return "stopped"
 
@@ -123,8 +420,8 @@ class NonDeterministicTuringMachine:
 
         # Print each configuration in the path
         for config in path:
-            tape = config.tape
-            state = config.state
+            tape = self.tape_text(config)
+            state = self.state_names[config.state]
             head = config.head
 
             if head < 0:
@@ -142,28 +439,46 @@ class NonDeterministicTuringMachine:
 
             print(f"{left:<10} | {state:<4} | {head_char:<5} | {right}")
 
+    # Returns the contents of a configuration's tape as a string
+    def tape_text(self, config):
+        if isinstance(config.tape, int):
+            return "".join(self.bitmap_symbols[(config.tape >> i) & 1] for i in range(config.tape_len))
+        text = config.tape[:config.tape_len].decode("latin-1")
+        if self.unreadable:
+            text = "".join(self.unreadable.get(i, char) for i, char in enumerate(text))
+        return text
+
     # Calculates the average branching factor across all levels
     def average_nondeterminism(self):
-        return sum(self.level_branching) / len(self.level_branching) if self.level_branching else 0
+        return self.sum_branching / self.num_branching_levels if self.num_branching_levels else 0
+
+# Runs a parsed machine on one input and prints the trace and summary
+def run_machine(ntm, input_string, max_depth, strategy="bfs"):
+    print(f"Machine Name: {ntm.name}")
+    print(f"Initial String: {input_string}")
+    print("-" * 40)
+
+    if strategy == "dfs":
+        result = ntm.simulate_dfs(input_string, max_depth)
+    else:
+        result = ntm.simulate(input_string, max_depth)
+    print("-" * 40)
+    print(f"Result: {result}")
+    print(f"Depth of Tree: {ntm.depth}")
+    print(f"Total Configurations Explored: {ntm.total_configurations}")
+    print(f"Average Nondeterminism: {ntm.average_nondeterminism():.2f}")
+    return result
 
 # Entry point for running the NTM simulation
 if __name__ == "__main__":
     if len(sys.argv) < 4:
-        print("Usage: python traceNTM.py <machine_file> <input_string> <max_depth>")
+        print("Usage: python traceNTM.py <machine_file> <input_string> <max_depth> [bfs|dfs]")
         sys.exit(1)
 
     machine_file = sys.argv[1]
     input_string = sys.argv[2]
     max_depth = int(sys.argv[3])
+    strategy = sys.argv[4] if len(sys.argv) > 4 else "bfs" # Search strategy: bfs or dfs
 
     ntm = NonDeterministicTuringMachine(machine_file)
-    print(f"Machine Name: {ntm.name}")
-    print(f"Initial String: {input_string}")
-    print("-" * 40)
-
-    result = ntm.simulate(input_string, max_depth)
-    print("-" * 40)
-    print(f"Result: {result}")
-    print(f"Depth of Tree: {len(ntm.tree) - 1}")
-    print(f"Total Configurations Explored: {ntm.total_configurations}")
-    print(f"Average Nondeterminism: {ntm.average_nondeterminism():.2f}")
+    run_machine(ntm, input_string, max_depth, strategy)